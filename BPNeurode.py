@@ -8,6 +8,8 @@ Author: Ethan Jordan
 Date: 11/1/2024
 """
 
+import numpy as np
+
 from Neurode import Neurode
 
 
@@ -45,11 +47,20 @@ class BPNeurode(Neurode):
             # For output layer nodes
             self._delta = ((target_value - self._value) *
                           self._sigmoid_derivative(self._value))
+        elif self._down and self._down[0]._up_W is not None:
+            # For hidden layer nodes inside a LayerList, whose downstream
+            # weights are one column of the shared layer matrix
+            deltas = self._down_scratch
+            for i, node in enumerate(self._down):
+                deltas[i] = node._delta
+            weighted_sum = float(
+                np.dot(self._down[0]._up_W[:, self._row], deltas))
+            self._delta = self._sigmoid_derivative(self._value) * weighted_sum
         else:
             # For hidden layer nodes
             weighted_sum = 0.0
-            for node in self._neighbors[self.Side.DOWNSTREAM]:
-                weighted_sum += node.delta * node._weights[self]
+            for node in self._down:
+                weighted_sum += node.delta * node.get_weight(self)
             self._delta = self._sigmoid_derivative(self._value) * weighted_sum
 
     @property
@@ -73,9 +84,20 @@ class BPNeurode(Neurode):
             self._update_weights()
 
     def _update_weights(self):
-        """Update weights for all downstream connections."""
+        """Update weights for all downstream connections.
+
+        Inside a LayerList the downstream weights are one column of the
+        shared layer matrix and are adjusted in a single array operation.
+        """
         learning_rate = 0.05
-        for node in self._neighbors[self.Side.DOWNSTREAM]:
+        if self._down and self._down[0]._up_W is not None:
+            deltas = self._down_scratch
+            for i, node in enumerate(self._down):
+                deltas[i] = node._delta
+            self._down[0]._up_W[:, self._row] += (
+                learning_rate * self._value * deltas)
+            return
+        for node in self._down:
             # Calculate adjustment for the downstream node
             adjustment = learning_rate * node.delta * self._value
             # Have the downstream node adjust its weights
@@ -88,7 +110,11 @@ class BPNeurode(Neurode):
             node: The connected node
             adjustment: Weight adjustment value
         """
-        self._weights[node] += adjustment
+        if (self._up_W is not None
+                and node in self._neighbor_index[self.Side.UPSTREAM]):
+            self._up_W[self._row, node._row] += adjustment
+        else:
+            self._weights[node] += adjustment
 
     def set_expected(self, target_value: float) -> None:
         """Set expected output value and start backpropagation.
@@ -101,5 +127,5 @@ class BPNeurode(Neurode):
 
     def _fire_upstream(self) -> None:
         """Signal all upstream nodes that data is ready."""
-        for node in self._neighbors[self.Side.UPSTREAM]:
+        for node in self._up:
             node.data_ready_downstream(self)
@@ -21,7 +21,8 @@ class FFBPNetwork:
 
         pass
 
-    def __init__(self, num_inputs: int, num_outputs: int, error_model: type):
+    def __init__(self, num_inputs: int, num_outputs: int, error_model: type,
+                 device="cpu"):
         """
         Init Method.
 
@@ -32,11 +33,14 @@ class FFBPNetwork:
             num_inputs (int): Number of input nodes.
             num_outputs (int): Number of output nodes.
             error_model (type): The error model to be used (e.g., RMSE).
+            device (str, optional): "cpu" or "cuda" (needs CuPy) for the
+            layer arrays. Defaults to "cpu".
         """
         self.num_inputs = num_inputs
         self.num_outputs = num_outputs
         self.error_model = error_model
-        self.layers = LayerList(num_inputs, num_outputs, FFBPNeurode)
+        self.layers = LayerList(num_inputs, num_outputs, FFBPNeurode,
+                                device)
 
     def add_hidden_layer(self, num_nodes: int, position=0):
         """
@@ -55,10 +59,13 @@ class FFBPNetwork:
         self.layers.add_layer(num_nodes)
 
     def train(self, data_set: NNData, epochs=1000, verbosity=2,
-              order=Order.SHUFFLE):
+              order=Order.SHUFFLE, batch_size=1):
         """
         Train the network using the given dataset.
 
+        Each batch is trained by the step that LayerList.compile() generates
+        for the network's shape.
+
         Args:
             data_set (NNData): The dataset used for training.
             epochs (int, optional): Number of training epochs. Defaults to 1000.
@@ -66,6 +73,8 @@ class FFBPNetwork:
             detailed). Defaults to 2.
             order (Order, optional): Order of data presentation (e.g., SHUFFLE,
             RANDOM). Defaults to Order.SHUFFLE.
+            batch_size (int, optional): Number of samples per weight update.
+            Defaults to 1.
 
         Raises:
             EmptySetException: If the training set is empty.
@@ -78,44 +87,42 @@ class FFBPNetwork:
             raise self.EmptySetException("Training set is empty")
 
         rmse = self.error_model()
+        # Generate a training step unrolled for this network's shape
+        self.layers.compile()
+        xp = self.layers.xp
         for epoch in range(epochs):
             rmse.reset()
-            data_set.prime_data(Set.TRAIN, order)
             total_error = 0  # Initialize total error for the epoch
 
-            while not data_set.pool_is_empty(Set.TRAIN):
-                feature, label = data_set.get_one_item(Set.TRAIN)
-
-                # Set inputs directly to input nodes
-                if len(feature) != len(self.layers.input_nodes):
+            # On the GPU the batches and the error stay on the device
+            for features, labels in data_set.batches(batch_size, Set.TRAIN,
+                                                     order, xp):
+                # Check the inputs fit the input layer
+                if features.shape[1] != len(self.layers.input_nodes):
                     raise ValueError("The number of inputs does not match the"
                                      "number of input neurodes.")
-                for neurode, value in zip(self.layers.input_nodes, feature):
-                    neurode._value = value  # Set the input value
-
-                # Trigger downstream process for all input nodes
-                for node in self.layers.input_nodes:
-                    node._fire_downstream()
 
-                predictions = [node._value for node in self.layers.output_nodes]
-                rmse.distance(predictions, label)
-                total_error += sum((p - t) ** 2 for p, t in zip(predictions,
-                                                                label))
-
-                # Present targets to output nodes
-                for node, target in zip(self.layers.output_nodes, label):
-                    node.set_expected(target)
+                # Forward pass, backpropagation and weight update in one step
+                predictions = self.layers.step(features, labels)
+                total_error += ((predictions - labels) ** 2).sum(
+                    dtype=xp.float64)
 
                 if verbosity > 1 and epoch % 1000 == 0:
-                    print(f"Input: {feature}, Expected: {label}, Output: {predictions}")
+                    for feature, label, prediction in zip(
+                            *map(self.layers.to_host,
+                                 (features, labels, predictions))):
+                        print(f"Input: {feature}, Expected: {label}, "
+                              f"Output: {prediction.tolist()}")
 
             # Calculate RMSE for this epoch
-            epoch_rmse = (total_error /
+            epoch_rmse = (float(total_error) /
                           data_set.number_of_samples(Set.TRAIN)) ** 0.5
 
             if verbosity > 0 and epoch % 100 == 0:
                 print(f"Epoch {epoch}, RMSE: {epoch_rmse:.4f}")
 
+        # Leave the last sample's values and deltas on the neurodes
+        self.layers.sync_neurodes()
         print(f"Final RMSE: {epoch_rmse:.4f}")
 
     def test(self, data_set: NNData, order=Order.STATIC):
@@ -142,18 +149,13 @@ class FFBPNetwork:
         while not data_set.pool_is_empty(Set.TEST):
             feature, label = data_set.get_one_item(Set.TEST)
 
-            # Directly set inputs for input nodes
+            # Check the inputs fit the input layer
             if len(feature) != len(self.layers.input_nodes):
                 raise ValueError("Number of inputs does not match the number of input neurodes.")
 
-            for neurode, value in zip(self.layers.input_nodes, feature):
-                neurode._value = value  # Set the input value directly
-
-            # Trigger downstream processing from input neurodes
-            for neurode in self.layers.input_nodes:
-                neurode._fire_downstream()  # Ensure this method exists in FFBPNeurode
-
-            predictions = [neurode._value for neurode in self.layers.output_nodes]
+            # Run the whole forward pass a layer at a time
+            predictions = self.layers.to_host(
+                self.layers.forward(feature)).tolist()
             rmse.distance(predictions, label)
             print(f"Input: {feature}, Expected: {label}, Output: {predictions}")
 
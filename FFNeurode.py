@@ -6,6 +6,7 @@ feed-forward Neural Network.
 """
 from __future__ import annotations
 from Neurode import Neurode
+import math
 import numpy as np
 
 
@@ -32,23 +33,35 @@ class FFNeurode(Neurode):
         Returns:
             float: The result of the sigmoid function.
         """
-        return 1 / (1 + np.exp(-value))
+        try:
+            return 1.0 / (1.0 + math.exp(-value))
+        except OverflowError:
+            return 0.0
 
     def _calculate_value(self) -> None:
         """
         Calculate the weighted sum of upstream nodes' values.
 
         Apply the sigmoid function, and store the result in self._value.
+        Inside a LayerList the upstream weights are one contiguous row of
+        the layer matrix, so the sum is a single dot product against the
+        upstream values gathered into a reusable buffer.
         """
-        weighted_sum = sum(
-            self.get_weight(node) * node.value
-            for node in self._neighbors[self.Side.UPSTREAM]
-        )
+        upstream = self._up
+        if self._up_W is not None:
+            values = self._up_scratch
+            for j, node in enumerate(upstream):
+                values[j] = node._value
+            weighted_sum = float(np.dot(self._up_W[self._row], values))
+        else:
+            weighted_sum = sum(
+                self.get_weight(node) * node.value for node in upstream
+            )
         self._value = self._sigmoid(weighted_sum)
 
     def _fire_downstream(self) -> None:
         """Call data_ready_upstream on each downstream neighbor."""
-        for node in self._neighbors[self.Side.DOWNSTREAM]:
+        for node in self._down:
             node.data_ready_upstream(self)
 
     def data_ready_upstream(self, node: Neurode) -> None:
@@ -74,5 +87,5 @@ class FFNeurode(Neurode):
             neurode.
         """
         self._value = input_value
-        for node in self._neighbors[self.Side.DOWNSTREAM]:
+        for node in self._down:
             node.data_ready_upstream(self)
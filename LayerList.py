@@ -5,9 +5,31 @@ This module extends the DoublyLinkedList to create a LayerList
 specifically for a feed-forward backpropagation neural network.
 It initializes input and output layers with the given number of
 neurodes and allows for the addition and removal of hidden layers.
+
+Besides the per-neurode event path, the LayerList can run the forward
+pass layer by layer: each layer's activations are held in one numpy array
+and each connection between layers in one weight matrix, so a layer costs
+a single matrix product instead of a Python loop per neurode. The
+backward pass works the same way, keeping one delta array per layer.
+Samples can be passed in batches, one row per sample.
+When Numba is installed, single-sample forward passes through layers of
+up to KERNEL_MAX_WEIGHTS weights run in the fused kernel from
+FFNeurode_kernels instead of separate numpy calls. With CuPy installed,
+device='cuda' keeps the layer arrays on the GPU instead.
 """
+import numpy as np
+
 from DoublyLinkedList import DoublyLinkedList
 
+try:
+    import FFNeurode_kernels
+except ImportError:
+    FFNeurode_kernels = None
+
+# Largest weight matrix for which the single-threaded fused kernel beats
+# numpy's BLAS product on one sample.
+KERNEL_MAX_WEIGHTS = 256 * 256
+
 
 class LayerList(DoublyLinkedList):
     """Layerlist class for the layers of the Network.
@@ -18,18 +40,47 @@ class LayerList(DoublyLinkedList):
 
     Args:
         DoublyLinkedList (class): Inheritance of the DLL
+
+    Attributes:
+        _step_cache (dict): Class-wide cache of generated training steps,
+        keyed by array module name and layer widths
     """
 
+    _step_cache = {}
+
     def _link_with_next(self):
-        """Connect neurodes in current and next node bidirectionally."""
-        for node in self._curr.data:
-            node.reset_neighbors(self._curr.next.data,
+        """Connect neurodes in current and next node bidirectionally.
+
+        The weights of the connection are allocated as one float32 matrix
+        of shape (len(next), len(current)) shared by the downstream
+        neurodes, each of which owns one row. They are drawn in one call
+        with Xavier scaling, N(0, 1 / len(current)), which keeps the
+        sigmoids out of saturation better than uniform [0, 1) weights.
+        The matrix is attached before the neighbors are reset, so the
+        neurodes draw no weights of their own; their _weights dictionaries
+        are only filled by sync_neurodes().
+        """
+        upstream = self._curr.data
+        downstream = self._curr.next.data
+        W = np.random.standard_normal(
+            (len(downstream), len(upstream))).astype(np.float32)
+        W *= np.sqrt(1.0 / max(len(upstream), 1))
+        for j, node in enumerate(upstream):
+            node._row = j
+            node.reset_neighbors(downstream,
                                  self._neurode_type.Side.DOWNSTREAM)
-        for node in self._curr.next.data:
-            node.reset_neighbors(self._curr.data,
+        for i, node in enumerate(downstream):
+            node._row = i
+            node._up_W = W
+            node._weights.clear()
+            node.reset_neighbors(upstream,
                                  self._neurode_type.Side.UPSTREAM)
+        self._W = None
+        self._Wq = None
+        self._layers_arr = None
+        self._step = None
 
-    def __init__(self, inputs, outputs, neurode_type):
+    def __init__(self, inputs, outputs, neurode_type, device="cpu"):
         """
         Initialize the LayerList with input & output neurodes and connect them.
 
@@ -37,9 +88,39 @@ class LayerList(DoublyLinkedList):
             inputs (int): Number of input neurodes.
             outputs (int): Number of output neurodes.
             neurode_type: Type of neurode to be used.
+            device (str, optional): "cpu" or "cuda". With "cuda" the layer
+            arrays live on the GPU and the neurodes only see the weights
+            after sync_neurodes(). Defaults to "cpu".
+
+        Raises:
+            ValueError: If a layer is empty or the device is unknown.
+            ImportError: If device is "cuda" and CuPy is not installed.
         """
         super().__init__()
         self._neurode_type = neurode_type
+        if device == "cpu":
+            self._xp = np
+            self._kernels = FFNeurode_kernels
+        elif device == "cuda":
+            # Imported here so that CPU-only users never load CuPy
+            try:
+                import cupy
+            except ImportError:
+                raise ImportError("device='cuda' requires CuPy") from None
+            self._xp = cupy
+            self._kernels = None
+        else:
+            raise ValueError(f"Unknown device {device!r}")
+        self._W = None
+        self._act = None
+        self._delta = None
+        self._tmp = None
+        self._grad = None
+        self._sizes = None
+        self._Wq = None
+        self._W_scale = None
+        self._layers_arr = None
+        self._step = None
         if inputs < 1 or outputs < 1:
             raise ValueError
         input_layer = [neurode_type() for _ in range(inputs)]
@@ -73,6 +154,333 @@ class LayerList(DoublyLinkedList):
         self.remove_after_current()
         self._link_with_next()
 
+    def _rebuild_cache(self):
+        """Walk the list once and cache its layers in order."""
+        layers = []
+        node = self._head
+        while node:
+            layers.append(node.data)
+            node = node.next
+        self._layers_arr = layers
+
+    @property
+    def _layers(self):
+        """Layers from input to output, rebuilt after any relinking."""
+        if self._layers_arr is None:
+            self._rebuild_cache()
+        return self._layers_arr
+
+    def _materialize(self):
+        """Collect the weight matrices and allocate activation buffers.
+
+        W[l] has shape (n[l + 1], n[l]) and is the same array the neurodes
+        of layer l + 1 read and adjust, so both paths see one set of weights.
+        On the GPU, W[l] is a device copy of that array instead.
+        """
+        layers = self._layers
+        self._W_host = [
+            downstream[0]._up_W if downstream
+            else np.zeros((0, len(upstream)), dtype=np.float32)
+            for upstream, downstream in zip(layers, layers[1:])
+        ]
+        if self._xp is np:
+            self._W = self._W_host
+        else:
+            self._W = [self._xp.asarray(W) for W in self._W_host]
+        self._sizes = [len(layer) for layer in layers]
+        self._grad = [self._xp.empty_like(W) for W in self._W]
+        self._allocate(1)
+
+    def _allocate(self, batch_size):
+        """Allocate activation, delta and scratch buffers for a batch."""
+        xp = self._xp
+        self._act = [xp.zeros((batch_size, n), dtype=np.float32)
+                     for n in self._sizes]
+        self._delta = [xp.zeros((batch_size, n), dtype=np.float32)
+                       for n in self._sizes]
+        self._tmp = [xp.empty_like(act) for act in self._act]
+
+    def forward_batch(self, X):
+        """
+        Run a batch of samples through the network a whole layer at a time.
+
+        Each layer is computed as sigmoid(act @ W.T), one matrix-matrix
+        product for the whole batch.
+
+        Args:
+            X: Input values of shape (batch_size, number of input neurodes).
+
+        Returns:
+            numpy.ndarray: Output activations of shape (batch_size, number
+            of output neurodes). The array is reused by the next call, so
+            copy it to keep it.
+        """
+        if self._W is None:
+            self._materialize()
+        if self._act[0].shape[0] != len(X):
+            self._allocate(len(X))
+        xp = self._xp
+        act = self._act
+        act[0][...] = xp.asarray(X)
+        single = len(X) == 1 and self._kernels is not None
+        for k, W in enumerate(self._W):
+            out = act[k + 1]
+            if single and W.size <= KERNEL_MAX_WEIGHTS:
+                self._kernels.sigmoid_matvec(W, act[k][0], out[0])
+                continue
+            xp.dot(act[k], W.T, out=out)
+            xp.negative(out, out=out)
+            xp.exp(out, out=out)
+            out += 1
+            xp.reciprocal(out, out=out)
+        return act[-1]
+
+    def backward_batch(self, Y):
+        """
+        Backpropagate the error of the last forward_batch() call.
+
+        All deltas are computed from the current weights before any weight
+        matrix is adjusted, matching the order of the neurode event path.
+        The sigmoid derivative act * (1 - act) is built in the preallocated
+        _tmp buffers, so the pass allocates nothing once warmed up.
+        The gradient is averaged over the batch, so each weight matrix gets
+        one update of learning_rate / batch_size * delta.T @ act, a BLAS
+        matrix product for the whole batch.
+
+        Args:
+            Y: Expected values of shape (batch_size, number of output
+            neurodes).
+        """
+        xp = self._xp
+        act, delta, tmp, W = self._act, self._delta, self._tmp, self._W
+        batch_size = act[0].shape[0]
+        learning_rate = self._neurode_type._learning_rate
+        out = act[-1]
+        xp.subtract(xp.asarray(Y), out, out=delta[-1])
+        xp.subtract(1.0, out, out=tmp[-1])
+        xp.multiply(tmp[-1], out, out=tmp[-1])
+        delta[-1] *= tmp[-1]
+        for k in range(len(W) - 1, 0, -1):
+            xp.dot(delta[k + 1], W[k], out=delta[k])
+            xp.subtract(1.0, act[k], out=tmp[k])
+            xp.multiply(tmp[k], act[k], out=tmp[k])
+            delta[k] *= tmp[k]
+        for k, grad in enumerate(self._grad):
+            xp.dot(delta[k + 1].T, act[k], out=grad)
+            grad *= learning_rate / batch_size
+            W[k] += grad
+
+    @staticmethod
+    def _build_step(widths, xp):
+        """
+        Generate a training step unrolled for one network shape.
+
+        Args:
+            widths: Number of neurodes in each layer, input layer first.
+            xp: Array module the step runs on, numpy or cupy.
+
+        Returns:
+            function: _step(X, Y, Ws, acts, deltas, tmps, grads, rate) doing
+            the forward pass, backpropagation and weight update as
+            straight-line numpy calls, and returning the output activations.
+        """
+        depth = len(widths) - 1
+        shape = "-".join(str(n) for n in widths)
+        lines = ["def _step(X, Y, Ws, acts, deltas, tmps, grads, rate):",
+                 f'    """Train one batch on a {shape} network."""']
+        for k in range(depth + 1):
+            lines.append(f"    a{k} = acts[{k}]")
+            lines.append(f"    d{k} = deltas[{k}]")
+            lines.append(f"    t{k} = tmps[{k}]")
+        for k in range(depth):
+            lines.append(f"    W{k} = Ws[{k}]")
+            lines.append(f"    g{k} = grads[{k}]")
+        lines.append("    a0[...] = X")
+        for k in range(depth):
+            a = f"a{k + 1}"
+            lines += [f"    np.dot(a{k}, W{k}.T, out={a})",
+                      f"    np.negative({a}, out={a})",
+                      f"    np.exp({a}, out={a})",
+                      f"    {a} += 1",
+                      f"    np.reciprocal({a}, out={a})"]
+        lines.append(f"    np.subtract(Y, a{depth}, out=d{depth})")
+        for k in range(depth, 0, -1):
+            if k < depth:
+                lines.append(f"    np.dot(d{k + 1}, W{k}, out=d{k})")
+            lines += [f"    np.subtract(1.0, a{k}, out=t{k})",
+                      f"    np.multiply(t{k}, a{k}, out=t{k})",
+                      f"    d{k} *= t{k}"]
+        for k in range(depth):
+            lines += [f"    np.dot(d{k + 1}.T, a{k}, out=g{k})",
+                      f"    g{k} *= rate",
+                      f"    W{k} += g{k}"]
+        lines.append(f"    return a{depth}")
+        namespace = {"np": xp}
+        exec("\n".join(lines), namespace)
+        return namespace["_step"]
+
+    def compile(self):
+        """
+        Specialize step() for the current network shape.
+
+        The generated step owns training: FFBPNetwork.train() compiles
+        before its first epoch, so every weight update it makes goes through
+        this code. It runs the same numpy operations in the same order as
+        forward_batch() followed by backward_batch(), which remain the
+        reference path for single passes and for uncompiled lists. The
+        generated code is shared by every LayerList with the same layer
+        widths. Adding or removing a layer drops it again.
+        """
+        if self._W is None:
+            self._materialize()
+        widths = tuple(self._sizes)
+        key = (self._xp.__name__, widths)
+        if key not in LayerList._step_cache:
+            LayerList._step_cache[key] = LayerList._build_step(widths,
+                                                               self._xp)
+        self._step = LayerList._step_cache[key]
+
+    def step(self, X, Y):
+        """
+        Train on one batch: forward pass, backpropagation and weight update.
+
+        Uses the routine generated by compile() when there is one, and
+        forward_batch() followed by backward_batch() otherwise.
+
+        Args:
+            X: Input values of shape (batch_size, number of input neurodes).
+            Y: Expected values of shape (batch_size, number of output
+            neurodes).
+
+        Returns:
+            numpy.ndarray: Output activations from before the update. The
+            array is reused by the next call, so copy it to keep it.
+        """
+        if self._step is None:
+            predictions = self.forward_batch(X)
+            self.backward_batch(Y)
+            return predictions
+        if self._act[0].shape[0] != len(X):
+            self._allocate(len(X))
+        learning_rate = self._neurode_type._learning_rate
+        return self._step(self._xp.asarray(X), self._xp.asarray(Y), self._W,
+                          self._act, self._delta, self._tmp, self._grad,
+                          learning_rate / len(X))
+
+    def forward(self, x):
+        """
+        Run one sample through the network a whole layer at a time.
+
+        Args:
+            x: Input values, one per input neurode.
+
+        Returns:
+            numpy.ndarray: Activations of the output layer. The array is
+            reused by the next call, so copy it to keep it.
+        """
+        return self.forward_batch(np.reshape(x, (1, -1)))[0]
+
+    def backward(self, target):
+        """
+        Backpropagate the error of the last forward() call and update weights.
+
+        Args:
+            target: Expected values, one per output neurode.
+        """
+        self.backward_batch(np.reshape(target, (1, -1)))
+
+    def quantize_inference(self):
+        """
+        Take an int8 copy of the weight matrices for forward_int8().
+
+        Each row is scaled by its own factor, max(abs(row)) / 127. The copy
+        is a snapshot, so call this again after further training.
+        """
+        if self._W is None:
+            self._materialize()
+        self._Wq = []
+        self._W_scale = []
+        for W in map(self.to_host, self._W):
+            scale = np.abs(W).max(axis=1, initial=0) / 127.0
+            scale[scale == 0] = 1.0
+            self._Wq.append(np.round(W / scale[:, None]).astype(np.int8))
+            self._W_scale.append(scale.astype(np.float32))
+
+    def forward_int8(self, x):
+        """
+        Run one sample through the int8 weights from quantize_inference().
+
+        The activations entering each layer are quantized to int8 as well,
+        the products are accumulated in int32 and the sigmoid is applied in
+        float32. Training still uses the float32 weights.
+
+        This simulates int8 inference to check its accuracy; it is not a
+        speedup. numpy has no int8 matrix product, so the int32 product is
+        slower than the float32 one that forward() uses.
+
+        Args:
+            x: Input values, one per input neurode.
+
+        Returns:
+            numpy.ndarray: Approximate activations of the output layer.
+        """
+        if self._Wq is None:
+            self.quantize_inference()
+        act = np.asarray(x, dtype=np.float32)
+        for Wq, scale in zip(self._Wq, self._W_scale):
+            x_scale = np.float32(np.abs(act).max(initial=0) / 127.0 or 1.0)
+            x_q = np.round(act / x_scale).astype(np.int8)
+            act = np.matmul(Wq, x_q, dtype=np.int32).astype(np.float32)
+            act *= scale * x_scale
+            np.negative(act, out=act)
+            np.exp(act, out=act)
+            act += 1
+            np.reciprocal(act, out=act)
+        return act
+
+    def to_host(self, array):
+        """
+        Return an array from this LayerList as a numpy array.
+
+        Args:
+            array: An array returned by one of the forward methods.
+
+        Returns:
+            numpy.ndarray: The array itself on the CPU, or a host copy of it
+            on the GPU.
+        """
+        if self._xp is np:
+            return array
+        return self._xp.asnumpy(array)
+
+    def sync_neurodes(self):
+        """Copy the last sample's activations and deltas to the neurodes.
+
+        The _weights dictionaries are filled from the weight matrices as
+        well, for code that still reads them directly. On the GPU the
+        neurodes' weight matrices are updated from the device first.
+        """
+        layers = self._layers
+        if self._W is not None:
+            if self._xp is not np:
+                for W_host, W in zip(self._W_host, self._W):
+                    W_host[...] = self.to_host(W)
+            act = [self.to_host(a) for a in self._act]
+            delta = [self.to_host(d) for d in self._delta]
+            for k, layer in enumerate(layers):
+                for i, neurode in enumerate(layer):
+                    neurode._value = float(act[k][-1, i])
+                    neurode._delta = float(delta[k][-1, i])
+        for upstream, downstream in zip(layers, layers[1:]):
+            for neurode in downstream:
+                neurode._weights = dict(
+                    zip(upstream, neurode._up_W[neurode._row].tolist()))
+
+    @property
+    def xp(self):
+        """Array module, numpy or cupy, that holds the layer arrays."""
+        return self._xp
+
     @property
     def input_nodes(self):
         """Return the list of input neurodes."""
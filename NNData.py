@@ -3,7 +3,6 @@
 from enum import Enum
 import numpy as np
 from collections import deque
-import random
 
 
 class Order(Enum):
@@ -21,7 +20,13 @@ class Set(Enum):
 
 
 class NNData:
-    """Class for managing neural network data."""
+    """Class for managing neural network data.
+
+    Attributes:
+        _rng (numpy.random.Generator): Generator shared by every shuffle.
+    """
+
+    _rng = np.random.default_rng()
 
     @staticmethod
     def percentage_limiter(percentage: float) -> float:
@@ -48,6 +53,8 @@ class NNData:
         self._test_pool = deque()
         self._features = None
         self._labels = None
+        self._features_f32 = None
+        self._labels_f32 = None
         self.load_data(features, labels)
 
     def load_data(self, features=None, labels=None):
@@ -77,6 +84,12 @@ class NNData:
                 raise ValueError(
                     "Features and labels must be convertible to float"
                 )
+        if self._features is None:
+            self._features_f32 = None
+            self._labels_f32 = None
+        else:
+            self._features_f32 = self._features.astype(np.float32)
+            self._labels_f32 = self._labels.astype(np.float32)
         self.split_set()
 
     def split_set(self, new_train_factor=None):
@@ -94,8 +107,8 @@ class NNData:
             return
         num_samples = len(self._features)
         num_train = int(num_samples * self._train_factor)
-        all_indices = list(range(num_samples))
-        random.shuffle(all_indices)
+        all_indices = np.arange(num_samples, dtype=np.int32)
+        NNData._rng.shuffle(all_indices)
         self._train_indices = all_indices[:num_train]
         self._test_indices = all_indices[num_train:]
 
@@ -107,18 +120,24 @@ class NNData:
         Args order: The order in which to access data (SHUFFLE, STATIC).
         """
         if target_set in {Set.TRAIN, None}:
-            self._train_pool = deque(self._train_indices)
-            if order == Order.SHUFFLE:
-                train_list = list(self._train_pool)
-                random.shuffle(train_list)
-                self._train_pool = deque(train_list)
+            self._train_pool = NNData._new_pool(self._train_indices, order)
 
         if target_set in {Set.TEST, None}:
-            self._test_pool = deque(self._test_indices)
-            if order == Order.SHUFFLE:
-                test_list = list(self._test_pool)
-                random.shuffle(test_list)
-                self._test_pool = deque(test_list)
+            self._test_pool = NNData._new_pool(self._test_indices, order)
+
+    @staticmethod
+    def _new_pool(indices, order):
+        """
+        Build a data pool from a set of indices.
+
+        Args indices: The indices the pool should hold.
+        Args order: SHUFFLE to permute the indices, STATIC to keep them.
+        Returns: A deque of the indices, shuffled in C by NNData._rng if asked.
+        """
+        pool = np.array(indices, dtype=np.int32)
+        if order == Order.SHUFFLE:
+            NNData._rng.shuffle(pool)
+        return deque(pool.tolist())
 
     def get_one_item(self, target_set=None):
         """
@@ -142,6 +161,39 @@ class NNData:
         index = pool.popleft()
         return self._features[index], self._labels[index]
 
+    def batches(self, batch_size, target_set=None, order=Order.STATIC,
+                xp=np):
+        """
+        Iterate once over the specified dataset in batches.
+
+        Unlike prime_data() and get_one_item(), no pool is built: a cursor
+        walks the index array of the set, which is shuffled in place when
+        asked, and each batch is looked up through a slice of it. With an
+        xp other than numpy the arrays are uploaded once per call, so the
+        batches are sliced on the device.
+
+        Args batch_size: The largest number of items in each batch.
+        Args target_set: The dataset to iterate over (TRAIN or TEST).
+        Args order: The order in which to access data (SHUFFLE, STATIC).
+        Args xp: The array module of the batches, e.g. numpy or cupy.
+        Returns: An iterator of float32 feature and label array pairs with
+        one row per item.
+        """
+        if self._features is None or self._labels is None:
+            return
+        if target_set == Set.TEST:
+            indices = np.asarray(self._test_indices)
+        else:
+            indices = np.asarray(self._train_indices)
+        if order == Order.SHUFFLE:
+            NNData._rng.shuffle(indices)
+        features = xp.asarray(self._features_f32)
+        labels = xp.asarray(self._labels_f32)
+        indices = xp.asarray(indices)
+        for cursor in range(0, len(indices), batch_size):
+            idx = indices[cursor:cursor + batch_size]
+            yield features[idx], labels[idx]
+
     def number_of_samples(self, target_set=None):
         """
         Get the number of samples in the specified dataset.
@@ -11,6 +11,7 @@ from __future__ import annotations
 from abc import ABC, abstractmethod
 from enum import Enum
 import random
+import numpy as np
 
 
 class MultiLinkNode(ABC):
@@ -39,11 +40,21 @@ class MultiLinkNode(ABC):
         Initialize a new MultiLinkNode.
 
         Creates dictionaries to track reporting status, reference values,
-        and neighboring nodes for both upstream and downstream connections.
+        neighboring nodes and each neighbor's position for both upstream
+        and downstream connections. The neighbor tuples are also kept in
+        _up and _down so hot methods can skip the dictionary lookup, and
+        _up_scratch/_down_scratch are reusable buffers of matching length
+        for gathering the neighbors' values.
         """
         self._reporting_nodes = {self.Side.UPSTREAM: 0, self.Side.DOWNSTREAM: 0}
         self._reference_value = {self.Side.UPSTREAM: 0, self.Side.DOWNSTREAM: 0}
-        self._neighbors = {self.Side.UPSTREAM: [], self.Side.DOWNSTREAM: []}
+        self._neighbors = {self.Side.UPSTREAM: (), self.Side.DOWNSTREAM: ()}
+        self._neighbor_index = {self.Side.UPSTREAM: {},
+                                self.Side.DOWNSTREAM: {}}
+        self._up = ()
+        self._down = ()
+        self._up_scratch = np.empty(0, dtype=np.float32)
+        self._down_scratch = np.empty(0, dtype=np.float32)
 
     def __str__(self) -> str:
         """
@@ -84,9 +95,18 @@ class MultiLinkNode(ABC):
 
         Note:
             This method also calculates the reference value for checking
-            when all nodes have reported.
-        """
-        self._neighbors[side] = nodes.copy()
+            when all nodes have reported. Neighbors are stored as a tuple,
+            which is cheaper to iterate than a list.
+        """
+        self._neighbors[side] = tuple(nodes)
+        scratch = np.empty(len(nodes), dtype=np.float32)
+        if side is self.Side.UPSTREAM:
+            self._up = self._neighbors[side]
+            self._up_scratch = scratch
+        else:
+            self._down = self._neighbors[side]
+            self._down_scratch = scratch
+        self._neighbor_index[side] = {node: i for i, node in enumerate(nodes)}
         for node in nodes:
             self._process_new_neighbor(node, side)
         self._reference_value[side] = 2 ** len(nodes) - 1
@@ -131,23 +151,28 @@ class Neurode(MultiLinkNode):
         Initialize a new Neurode.
 
         Creates a neurode with initial value of 0 and empty weights dictionary.
+        Once the neurode is linked into a LayerList, its upstream weights
+        live in row _row of the shared layer matrix _up_W instead.
         """
         super().__init__()
         self._value = 0
         self._weights = {}
+        self._up_W = None
+        self._row = 0
 
     def _process_new_neighbor(
             self, node: Neurode, side: MultiLinkNode.Side) -> None:
         """
         Process a newly added neighboring node.
 
-        For upstream neighbors, assigns a random initial weight.
+        For upstream neighbors, assigns a random initial weight, unless the
+        weights live in a shared layer matrix already.
 
         Args:
             node: The newly added neighboring node
             side: Indicates whether the neighbor is upstream or downstream
         """
-        if side == self.Side.UPSTREAM:
+        if side == self.Side.UPSTREAM and self._up_W is None:
             self._weights[node] = random.random()
 
     def _check_in(self, node: Neurode, side: MultiLinkNode.Side) -> bool:
@@ -164,7 +189,7 @@ class Neurode(MultiLinkNode):
             bool: True if all nodes on the given side have reported, False
             otherwise
         """
-        node_index = self._neighbors[side].index(node)
+        node_index = self._neighbor_index[side][node]
         self._reporting_nodes[side] |= 1 << node_index
         if self._reporting_nodes[side] == self._reference_value[side]:
             self._reporting_nodes[side] = 0
@@ -179,8 +204,13 @@ class Neurode(MultiLinkNode):
             node: The upstream node to get the weight for
 
         Returns:
-            float: The weight value for the given node
+            float: The weight value for the given node, or 0 if it is not
+            an upstream neighbor
         """
+        if self._up_W is not None:
+            if node not in self._neighbor_index[self.Side.UPSTREAM]:
+                return 0
+            return float(self._up_W[self._row, node._row])
         return self._weights.get(node, 0)
 
     @property
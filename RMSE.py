@@ -1,116 +1,313 @@
 """
 Root Mean Square Error (RMSE) Implementation with Multiple Distance Metrics.
 
-This module has an abstract base class for calculating Root Mean Square
+This module has a base class for calculating Root Mean Square
 Error using different distance metrics. It  both Euclidean and Taxicab
 distances. It has incremental updates through operator overloading (+=) and
-maintains a running collection of predicted and expected values.
+keeps a running sum of squared distances, so memory use and the cost of
+reading the error do not grow with the number of predictions. When Numba
+is installed, arrays and long points go through the kernels in
+RMSE_kernels.
 
 Classes:
-    RMSE: Abstract base class for RMSE calculations
+    RMSE: Base class for RMSE calculations
     Euclidean: RMSE implementation using Euclidean distance
     Taxicab: RMSE implementation using Manhattan distance
 """
 
-from abc import ABC, abstractmethod
+import copy
+import functools
 import math
 
+import numpy as np
 
-class RMSE(ABC):
+try:
+    import RMSE_kernels
+except ImportError:
+    RMSE_kernels = None
+
+
+# Largest point size for which the unrolled Python distance beats calling
+# a compiled kernel, whose input conversion dominates for small points.
+PYTHON_UNROLL_LIMIT = 16
+
+# Largest point size that gets a compiled unrolled kernel. The kernel only
+# saves a few loop iterations over the generic one, and its compile time
+# grows with every value, to over a second beyond this size.
+NUMBA_UNROLL_LIMIT = 32
+
+
+# Shortest list or tuple for which a compiled kernel beats the Python loop,
+# which saves converting the values to an array. Arrays always use kernels.
+KERNEL_MIN_LENGTH = 128
+
+
+def _use_kernel(values):
+    """Return whether a compiled kernel is the faster way over values."""
+    return RMSE_kernels is not None and (
+        isinstance(values, np.ndarray) or len(values) >= KERNEL_MIN_LENGTH)
+
+
+def _as_vector(values):
+    """Return values as a contiguous float64 array, without copying arrays."""
+    return np.ascontiguousarray(values, dtype=np.float64)
+
+
+@functools.lru_cache(maxsize=None)
+def _unrolled(term, n, square, fallback):
+    """
+    Generate a Python distance function for points of n values.
+
+    The Python counterpart of RMSE_kernels.unrolled(): one expression with
+    no zip() iterator or generator frame. Functions are memoized by their
+    arguments.
+
+    Args:
+        term (str): Expression for one element, with {k} standing for the
+        index, e.g. "abs(a[{k}] - b[{k}])".
+        n (int): Number of values in each point.
+        square (bool): Square the sum before returning it.
+        fallback (function): Generic distance for points that do not both
+        have n values.
+
+    Returns:
+        function: distance_sq(a, b), which hands points of any other size to
+        fallback, so it compares them like zip() would.
+    """
+    total = " + ".join(term.format(k=k) for k in range(n)) or "0.0"
+    lines = ["def distance_sq(a, b):",
+             f"    if len(a) != {n} or len(b) != {n}:",
+             "        return fallback(a, b)",
+             f"    total = {total}",
+             "    return total * total" if square else "    return total"]
+    namespace = {"fallback": fallback}
+    exec("\n".join(lines), namespace)
+    return namespace["distance_sq"]
+
+
+class RMSE:
     """
-    Abstract base class for Root Mean Square Error calculations.
+    Base class for Root Mean Square Error calculations.
 
     This class provides a framework for calculating RMSE using different
     distance metrics. Subclasses must implement the distance() method to
     define how differences between predicted and expected values are calculated.
+    It is a plain class with __slots__ rather than an ABC, so instances have
+    no __dict__ and attribute lookups go straight to the slots; RMSE itself
+    still cannot be instantiated.
 
     Attributes:
-        _predicted_values (list): Storage for predicted values
-        _expected_values (list): Storage for expected values
+        _sum_sq (float): Running sum of squared distances
+        _compensation (float): Rounding error lost from _sum_sq, added back
+        by error (Neumaier summation)
+        _n (int): Number of predictions added
+        _dim (int): Number of values in each prediction, once one was added
+        _distance_fn (function): Squared distance used by +=, resolved from
+        the class in reset() and unrolled for _dim values by
+        specialized(), so += reads it from a slot instead of looking the
+        metric up on every call
+        _scratch (numpy.ndarray): Reused buffer for the differences of a
+        batch added with +=
+        _term (str): One element of the distance sum for specialized(), or
+        None if the metric cannot be specialized
+        _square_sum (bool): Whether specialized() squares the sum
 
     Methods:
-        __add__: Adds a new prediction-expected pair
-        __iadd__: Implements the += operator
-        reset: Clears all stored values
+        __add__: Returns a copy with a new prediction-expected pair added
+        __iadd__: Adds a new prediction-expected pair in place (+=)
+        reset: Clears the running sum
         error: Calculates current RMSE (property)
-        distance: Abstract method for calculating distance (must be implemented
-        by subclasses)
+        specialized: Builds a squared distance for a fixed number of values
+        error_of: Calculates the RMSE of a whole batch at once
+        distance: Method for calculating distance (must be implemented by
+        subclasses)
+        _distance_sq: Method for the squared distance of one pair; by
+        default distance() squared
+        _squared_distances: Method for the squared distances of a whole
+        array of differences; by default _distance_sq() of each row
     """
 
+    __slots__ = ("_sum_sq", "_compensation", "_n", "_dim", "_distance_fn",
+                 "_scratch")
+    _term = None
+    _square_sum = False
+
     def __init__(self):
         """Initialize a new RMSE calculator.
 
-        Initializes empty lists for storing predicted and expected values by
-        calling the reset() method.
+        Starts the running sum at zero with the generic distance by calling
+        the reset() method.
+
+        Raises:
+            TypeError: If called for RMSE itself rather than a subclass
         """
+        if type(self) is RMSE:
+            raise TypeError("Can't instantiate base class RMSE")
+        self._scratch = None
         self.reset()
 
     def __add__(self, other):
-        """Add a new prediction-expected pair to the calculator.
+        """Return a new calculator with a prediction-expected pair added.
+
+        The calculator itself is left unchanged; use += to add in place.
 
         Args:
-            other (tuple): A tuple of length 2 containing:
-                - First element: predicted values (tuple/list)
-                - Second element: expected values (tuple/list)
+            other (tuple): A tuple of length 2 containing predicted and expected
+            values, as for __iadd__()
 
         Returns:
-            RMSE: Returns self for method chaining
-
-        Raises:
-            ValueError: If input is not a tuple of length 2
+            RMSE: A copy of this calculator including the new values
         """
-        if not isinstance(other, tuple) or len(other) != 2:
-            raise ValueError("Input must be a tuple of length 2")
-        self._predicted_values.append(other[0])
-        self._expected_values.append(other[1])
-        return self
+        new = copy.copy(self)
+        new += other
+        return new
 
     def __iadd__(self, other):
-        """Implement the += operator for adding prediction-expected pairs.
+        """Add a new prediction-expected pair to the calculator in place.
+
+        This is the += operator and the hot path for accumulating errors.
 
-        This method allows using the += operator as a shorthand for adding
-        new predictions, equivalent to calling __add__().
+        A whole batch can be added at once by passing two 2-D numpy arrays
+        with one prediction per row. Its squared distances are summed in
+        one vectorized pass, working in a buffer that is reused while the
+        batch shape stays the same.
 
         Args:
-            other (tuple): A tuple of length 2 containing predicted and expected
-            values
+            other (tuple): A tuple of length 2 containing:
+                - First element: predicted values (tuple/list, or 2-D array)
+                - Second element: expected values (tuple/list, or 2-D array)
 
         Returns:
             RMSE: Returns self after adding the new values
+
+        Raises:
+            ValueError: If input does not unpack into exactly two values
         """
-        return self.__add__(other)
+        try:
+            predicted, expected = other
+        except (TypeError, ValueError):
+            raise ValueError("Input must be a tuple of length 2") from None
+        if isinstance(predicted, np.ndarray) and predicted.ndim == 2:
+            if (self._scratch is None
+                    or self._scratch.shape != predicted.shape):
+                self._scratch = np.empty(predicted.shape, dtype=np.float64)
+            differences = np.subtract(predicted, expected, out=self._scratch)
+            squared = self._squared_distances(differences)
+            self._accumulate(float(squared.sum()), len(squared))
+            return self
+        if self._dim is None:
+            self._dim = len(predicted)
+            if self._term is not None:
+                self._distance_fn = self.specialized(self._dim)
+        self._accumulate(self._distance_fn(predicted, expected), 1)
+        return self
+
+    def _accumulate(self, sum_sq, count):
+        """Add sum_sq to the compensated running sum.
+
+        The rounding error of each addition is recovered exactly from the
+        larger and smaller operand and collected in _compensation
+        (Neumaier's variant of Kahan summation), so the total stays accurate
+        to about one rounding however many terms are added. Both operands
+        are sums of squares, so neither is negative.
+
+        Args:
+            sum_sq (float): Squared distances to add
+            count (int): Number of predictions they came from
+        """
+        total = self._sum_sq + sum_sq
+        if self._sum_sq >= sum_sq:
+            self._compensation += (self._sum_sq - total) + sum_sq
+        else:
+            self._compensation += (sum_sq - total) + self._sum_sq
+        self._sum_sq = total
+        self._n += count
 
     def reset(self):
-        """Reset the calculator by clearing all stored values.
+        """Reset the calculator by clearing the running sum.
 
-        Clears both the predicted and expected value lists, effectively
-        resetting the error calculation to its initial state.
+        Zeroes the sum of squared distances and the count and goes back to
+        the generic distance, effectively resetting the error calculation to
+        its initial state. The next += specializes again for its point size;
+        specialized distances are memoized, so that is a cache lookup.
         """
-        self._predicted_values = []
-        self._expected_values = []
+        self._sum_sq = 0.0
+        self._compensation = 0.0
+        self._n = 0
+        self._dim = None
+        self._distance_fn = type(self)._distance_sq
 
     @property
     def error(self):
         """Calculate and return the current Root Mean Square Error.
 
-        Computes RMSE using the stored predicted and expected values:
         RMSE = sqrt(sum((distance(predicted, expected))^2) / n)
-        where n is the number of predictions.
+        where n is the number of predictions. The sum is kept up to date by
+        +=, so this is constant time. Batches added as arrays are summed
+        with numpy's pairwise summation before they join the running sum.
+        Returns:
+            float: The calculated RMSE value. Returns 0 if no values were added.
+        """
+        if not self._n:
+            return 0
+        return math.sqrt((self._sum_sq + self._compensation) / self._n)
+
+    @classmethod
+    def error_of(cls, predicted, expected):
+        """
+        Calculate the RMSE of a whole batch of predictions at once.
+
+        This is the preferred entry point when all predictions are at hand,
+        such as a training epoch: the squared distances of every row are
+        computed and averaged in one vectorized pass. Use += to accumulate
+        predictions as they stream in.
+
+        Args:
+            predicted: N x D array of predicted values, one row per prediction
+            expected: N x D array of expected values
+
         Returns:
-            float: The calculated RMSE value. Returns 0 if no values are stored.
+            float: The RMSE over the N rows, 0 for an empty batch
         """
-        if not self._predicted_values or not self._expected_values:
+        differences = (np.asarray(predicted, dtype=np.float64)
+                       - np.asarray(expected, dtype=np.float64))
+        if not len(differences):
             return 0
-        total_error = 0
-        n = len(self._predicted_values)
-        for predicted, expected in zip(self._predicted_values,
-                                       self._expected_values):
-            total_error += self.distance(predicted, expected) ** 2
-        rmse = math.sqrt(total_error / n)
-        return rmse
+        return math.sqrt(float(cls._squared_distances(differences).mean()))
+
+    @classmethod
+    def specialized(cls, n):
+        """
+        Build a squared distance function for points of n values.
+
+        The loop over the values is unrolled from the metric's _term. Up to
+        PYTHON_UNROLL_LIMIT values this is a generated Python expression;
+        up to NUMBA_UNROLL_LIMIT it is compiled by RMSE_kernels.unrolled()
+        when Numba is installed. Larger points use the generic _distance_sq.
+
+        Args:
+            n (int): Number of values in each point
+
+        Returns:
+            function: distance_sq(predicted, expected), unrolled for n-value
+            points and equal to the generic _distance_sq for other sizes, or
+            the generic _distance_sq if no specialization applies
+        """
+        if n <= PYTHON_UNROLL_LIMIT:
+            return _unrolled(cls._term, n, cls._square_sum, cls._distance_sq)
+        if RMSE_kernels is None or n > NUMBA_UNROLL_LIMIT:
+            return cls._distance_sq
+        kernel = RMSE_kernels.unrolled(cls._term, n, cls._square_sum)
+
+        def distance_sq(predicted, expected):
+            a = _as_vector(predicted)
+            b = _as_vector(expected)
+            if a.shape[0] != n or b.shape[0] != n:
+                return cls._distance_sq(a, b)
+            return kernel(a, b)
+        return distance_sq
 
     @staticmethod
-    @abstractmethod
     def distance(predicted, expected):
         """
         Calculate the distance between predicted and expected values.
@@ -122,7 +319,46 @@ class RMSE(ABC):
         Returns:
             float: Distance between the predicted and expected values
         """
-        pass
+        raise NotImplementedError
+
+    @classmethod
+    def _distance_sq(cls, predicted, expected):
+        """
+        Calculate the squared distance between predicted and expected values.
+
+        This default squares distance(), so a subclass that only implements
+        distance() works; Euclidean and Taxicab override it.
+
+        Args:
+            predicted: Predicted values (typically a tuple or list)
+            expected: Expected values (typically a tuple or list)
+
+        Returns:
+            float: distance(predicted, expected) ** 2
+        """
+        distance = cls.distance(predicted, expected)
+        return distance * distance
+
+    @classmethod
+    def _squared_distances(cls, differences):
+        """
+        Calculate the squared distance of every row of differences.
+
+        This default passes each row through _distance_sq() against a
+        zero point, which is right for any distance that depends only on
+        predicted - expected, as every norm does. Subclasses override it
+        with a vectorized version.
+
+        Args:
+            differences (numpy.ndarray): predicted - expected, one row per
+            prediction
+
+        Returns:
+            numpy.ndarray: distance(predicted, expected) ** 2 for each row
+        """
+        zero = np.zeros(differences.shape[1])
+        return np.array([cls._distance_sq(row, zero) for row in differences],
+                        dtype=np.float64)
 
 
 class Euclidean(RMSE):
@@ -135,8 +371,16 @@ class Euclidean(RMSE):
 
     The Euclidean distance is appropriate when the magnitude of errors in all
     dimensions should be weighted quadratically.
+
+    Attributes:
+        _term (str): One element of the distance sum, for specialized()
+        _square_sum (bool): Whether specialized() squares the sum
     """
 
+    __slots__ = ()
+    _term = "(a[{k}] - b[{k}]) ** 2"
+    _square_sum = False
+
     @staticmethod
     def distance(predicted, expected):
         """
@@ -151,7 +395,126 @@ class Euclidean(RMSE):
         Returns:
             float: Euclidean distance between the points
         """
-        return math.sqrt(sum((p - e) ** 2 for p, e in zip(predicted, expected)))
+        return math.sqrt(Euclidean._distance_sq(predicted, expected))
+
+    @staticmethod
+    def _distance_sq(predicted, expected):
+        """
+        Calculate the squared Euclidean distance between two points.
+
+        This is the sum of squared differences with no square root, for
+        callers such as RMSE that would square the distance again.
+
+        Args:
+            predicted (tuple/list): Point in n-dimensional space (predicted
+            values)
+            expected (tuple/list): Point in n-dimensional space (expected
+            values)
+
+        Returns:
+            float: Squared Euclidean distance between the points
+        """
+        if _use_kernel(predicted):
+            return RMSE_kernels.squared_euclidean(_as_vector(predicted),
+                                                  _as_vector(expected))
+        total = 0.0
+        for p, e in zip(predicted, expected):
+            difference = p - e
+            total += difference * difference
+        return total
+
+    @staticmethod
+    def _squared_distances(differences):
+        """
+        Calculate squared Euclidean distances for rows of differences.
+
+        Args:
+            differences (numpy.ndarray): predicted - expected, one row per
+            prediction
+
+        Returns:
+            numpy.ndarray: Squared Euclidean length of each row
+        """
+        return np.einsum("ij,ij->i", differences, differences)
+
+    @staticmethod
+    def squared_norms(points):
+        """
+        Calculate the squared Euclidean norm of every row of points.
+
+        Args:
+            points (numpy.ndarray): One point per row
+
+        Returns:
+            numpy.ndarray: Squared length of each row, for reuse with
+            distance_sq_batch()
+        """
+        points = np.asarray(points, dtype=np.float64)
+        return np.einsum("ij,ij->i", points, points)
+
+    @staticmethod
+    def distance_sq_batch(predicted, expected, predicted_norms=None,
+                          expected_norms=None):
+        """
+        Calculate squared Euclidean distances between every pair of rows.
+
+        Uses ||p - e||^2 = ||p||^2 + ||e||^2 - 2 p.e, so the work is one
+        matrix product. Norms from squared_norms() can be passed in when
+        the same points are compared repeatedly.
+
+        Args:
+            predicted (numpy.ndarray): N predicted points, one per row
+            expected (numpy.ndarray): M expected points, one per row
+            predicted_norms (numpy.ndarray): Optional squared norms of the
+            predicted points
+            expected_norms (numpy.ndarray): Optional squared norms of the
+            expected points
+
+        Returns:
+            numpy.ndarray: N x M squared distances, clipped at zero against
+            rounding error
+        """
+        predicted = np.asarray(predicted, dtype=np.float64)
+        expected = np.asarray(expected, dtype=np.float64)
+        if predicted_norms is None:
+            predicted_norms = Euclidean.squared_norms(predicted)
+        if expected_norms is None:
+            expected_norms = Euclidean.squared_norms(expected)
+        distances = predicted @ expected.T
+        distances *= -2
+        distances += predicted_norms[:, None]
+        distances += expected_norms[None, :]
+        return np.maximum(distances, 0, out=distances)
+
+    @staticmethod
+    def error_cuda(predicted, expected):
+        """
+        Calculate the RMSE of a batch that lives on a CUDA device.
+
+        Args:
+            predicted: N x D device array (Numba or CuPy) of predictions
+            expected: N x D device array of expected values
+
+        Returns:
+            float: The RMSE over the N rows, 0 for an empty batch
+
+        Raises:
+            RuntimeError: If Numba or a CUDA device is not available
+        """
+        try:
+            import RMSE_cuda
+        except ImportError:
+            RMSE_cuda = None
+        if RMSE_cuda is None or not RMSE_cuda.cuda.is_available():
+            raise RuntimeError("error_cuda() requires Numba and a CUDA device")
+        n = predicted.shape[0]
+        if not n:
+            return 0
+        total = RMSE_cuda.cuda.to_device(np.zeros(1))
+        threads = RMSE_cuda.THREADS
+        RMSE_cuda.sum_sq[(n + threads - 1) // threads, threads](
+            predicted, expected, total)
+        return math.sqrt(total.copy_to_host()[0] / n)
 
 
 class Taxicab(RMSE):
@@ -163,8 +526,16 @@ class Taxicab(RMSE):
 
     The Taxicab distance is appropriate when the magnitude of errors in all
     dimensions should be weighted linearly and independently.
+
+    Attributes:
+        _term (str): One element of the distance sum, for specialized()
+        _square_sum (bool): Whether specialized() squares the sum
     """
 
+    __slots__ = ()
+    _term = "abs(a[{k}] - b[{k}])"
+    _square_sum = True
+
     @staticmethod
     def distance(predicted, expected):
         """
@@ -179,4 +550,75 @@ class Taxicab(RMSE):
         Returns:
             float: Taxicab distance between the points
         """
+        if _use_kernel(predicted):
+            return RMSE_kernels.taxicab(_as_vector(predicted),
+                                        _as_vector(expected))
         return sum(abs(p - e) for p, e in zip(predicted, expected))
+
+    @staticmethod
+    def distance_u8(predicted, expected):
+        """
+        Calculate the Taxicab distance between two points of unsigned bytes.
+
+        The bytes are widened to int16 in one pass, which leaves room for
+        negative differences, and reduced with numpy. One byte per value
+        moves an eighth of the memory of float64 points.
+
+        Args:
+            predicted (bytes-like): Point with one value from 0 to 255 per
+            byte, such as bytes or a uint8 array
+            expected (bytes-like): Point of the same length
+
+        Returns:
+            int: Taxicab distance between the points
+
+        Raises:
+            ValueError: If the points differ in length
+        """
+        a = np.frombuffer(predicted, dtype=np.uint8)
+        b = np.frombuffer(expected, dtype=np.uint8)
+        if len(a) != len(b):
+            raise ValueError("Points must have the same length")
+        return int(np.abs(a.astype(np.int16) - b.astype(np.int16)).sum())
+
+    @staticmethod
+    def _distance_sq(predicted, expected):
+        """
+        Calculate the squared Taxicab distance between two points.
+
+        Args:
+            predicted (tuple/list): Point in n-dimensional space (predicted
+            values)
+            expected (tuple/list): Point in n-dimensional space (expected
+            values)
+
+        Returns:
+            float: Squared Taxicab distance between the points
+        """
+        if _use_kernel(predicted):
+            total = RMSE_kernels.taxicab(_as_vector(predicted),
+                                         _as_vector(expected))
+            return total * total
+        total = 0.0
+        for p, e in zip(predicted, expected):
+            total += abs(p - e)
+        return total * total
+
+    @staticmethod
+    def _squared_distances(differences):
+        """
+        Calculate squared Taxicab distances for rows of differences.
+
+        The absolute values are taken in place, so no temporary the size of
+        differences is allocated.
+
+        Args:
+            differences (numpy.ndarray): predicted - expected, one row per
+            prediction; overwritten with its absolute values
+
+        Returns:
+            numpy.ndarray: Squared Taxicab length of each row
+        """
+        distances = np.abs(differences, out=differences).sum(axis=1)
+        distances *= distances
+        return distances
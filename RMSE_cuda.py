@@ -0,0 +1,43 @@
+"""
+CUDA kernel for the RMSE of a batch held on the GPU.
+
+Kept apart from RMSE_kernels because importing numba.cuda is slow: RMSE
+only imports this module the first time Euclidean.error_cuda() is called.
+"""
+from numba import cuda, float64
+
+THREADS = 256
+
+
+@cuda.jit
+def sum_sq(P, E, out):
+    """
+    Add the squared Euclidean distances between the rows of P and E to out.
+
+    Launch with THREADS threads per block and one thread per row. Each
+    block sums its rows in shared memory, then adds the total to out[0]
+    with a single atomic add.
+
+    Args:
+        P: Device array of predicted points, one per row.
+        E: Device array of expected points, the same shape as P.
+        out: Device array of length 1 holding the running sum.
+    """
+    partial = cuda.shared.array(THREADS, float64)
+    i = cuda.grid(1)
+    t = cuda.threadIdx.x
+    s = 0.0
+    if i < P.shape[0]:
+        for k in range(P.shape[1]):
+            d = P[i, k] - E[i, k]
+            s += d * d
+    partial[t] = s
+    cuda.syncthreads()
+    stride = THREADS // 2
+    while stride > 0:
+        if t < stride:
+            partial[t] += partial[t + stride]
+        cuda.syncthreads()
+        stride //= 2
+    if t == 0:
+        cuda.atomic.add(out, 0, partial[0])
@@ -0,0 +1,103 @@
+"""
+Compiled kernels for the RMSE distance metrics.
+
+Each kernel reduces two contiguous float64 vectors to one distance in a
+single pass. The pass keeps four independent partial sums, so consecutive
+additions do not wait on each other, and LLVM maps them onto SIMD lanes.
+They are compiled with Numba, which is an optional dependency: RMSE falls
+back to plain Python when this module cannot be imported. The CUDA
+reduction lives in RMSE_cuda, so importing this module does not pull in
+numba.cuda.
+"""
+import functools
+
+from numba import float64, njit
+
+
+@njit("f8(f8[::1], f8[::1])", fastmath=True, cache=True,
+      locals={"acc0": float64, "acc1": float64, "acc2": float64,
+              "acc3": float64, "diff": float64})
+def squared_euclidean(x, y):
+    """
+    Compute the squared Euclidean distance sum((x - y) ** 2).
+
+    Args:
+        x: First point.
+        y: Second point. Like zip(), only the first min(len(x), len(y))
+        elements are compared.
+
+    Returns:
+        float: The squared Euclidean distance between the points.
+    """
+    n = min(x.shape[0], y.shape[0])
+    acc0 = acc1 = acc2 = acc3 = 0.0
+    for i in range(0, n - 3, 4):
+        diff = x[i] - y[i]
+        acc0 += diff * diff
+        diff = x[i + 1] - y[i + 1]
+        acc1 += diff * diff
+        diff = x[i + 2] - y[i + 2]
+        acc2 += diff * diff
+        diff = x[i + 3] - y[i + 3]
+        acc3 += diff * diff
+    for i in range(n - n % 4, n):
+        diff = x[i] - y[i]
+        acc0 += diff * diff
+    return (acc0 + acc1) + (acc2 + acc3)
+
+
+@njit("f8(f8[::1], f8[::1])", fastmath=True, cache=True,
+      locals={"acc0": float64, "acc1": float64, "acc2": float64,
+              "acc3": float64})
+def taxicab(x, y):
+    """
+    Compute the Taxicab distance sum(abs(x - y)).
+
+    Args:
+        x: First point.
+        y: Second point. Like zip(), only the first min(len(x), len(y))
+        elements are compared.
+
+    Returns:
+        float: The Taxicab distance between the points.
+    """
+    n = min(x.shape[0], y.shape[0])
+    acc0 = acc1 = acc2 = acc3 = 0.0
+    for i in range(0, n - 3, 4):
+        acc0 += abs(x[i] - y[i])
+        acc1 += abs(x[i + 1] - y[i + 1])
+        acc2 += abs(x[i + 2] - y[i + 2])
+        acc3 += abs(x[i + 3] - y[i + 3])
+    for i in range(n - n % 4, n):
+        acc0 += abs(x[i] - y[i])
+    return (acc0 + acc1) + (acc2 + acc3)
+
+
+@functools.lru_cache(maxsize=None)
+def unrolled(term, n, square=False):
+    """
+    Generate and compile a distance kernel for points of exactly n elements.
+
+    The loop over the elements is written out as n straight-line additions,
+    so there is no loop overhead left for small n. Kernels are memoized by
+    their arguments.
+
+    Args:
+        term (str): Expression for one element, with {k} standing for the
+        index, e.g. "abs(a[{k}] - b[{k}])".
+        n (int): Number of elements in each point.
+        square (bool): Square the sum before returning it.
+
+    Returns:
+        function: Compiled kernel(a, b) on contiguous float64 arrays, which
+        raises ValueError if either array does not have n elements.
+    """
+    lines = ["def kernel(a, b):",
+             f"    if a.shape[0] != {n} or b.shape[0] != {n}:",
+             f'        raise ValueError("Points must have {n} elements")',
+             "    acc = 0.0"]
+    lines += [f"    acc += {term.format(k=k)}" for k in range(n)]
+    lines.append("    return acc * acc" if square else "    return acc")
+    namespace = {}
+    exec("\n".join(lines), namespace)
+    return njit("f8(f8[::1], f8[::1])", fastmath=True)(namespace["kernel"])
@@ -0,0 +1,20 @@
+import pytest
+import numpy
+
+numba = pytest.importorskip("numba")
+
+try:
+    import FFNeurode_kernels
+except ImportError:
+    pytest.fail("Cannot import FFNeurode_kernels. "
+                "Is FFNeurode_kernels.py present?")
+
+
+def test_sigmoid_matvec():
+    rng = numpy.random.default_rng(0)
+    W = rng.standard_normal((4, 3), dtype=numpy.float32)
+    x = rng.standard_normal(3, dtype=numpy.float32)
+    out = numpy.empty(4, dtype=numpy.float32)
+    FFNeurode_kernels.sigmoid_matvec(W, x, out)
+    assert numpy.allclose(out, 1 / (1 + numpy.exp(-(W @ x))), atol=1e-6), \
+        "sigmoid_matvec does not match sigmoid(W @ x)"
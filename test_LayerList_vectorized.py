@@ -0,0 +1,156 @@
+import os
+import subprocess
+import sys
+
+import numpy as np
+import pytest
+
+from FFBPNeurode import FFBPNeurode
+from LayerList import LayerList
+
+
+def make_network(seed, hidden=(4, 3)):
+    np.random.seed(seed)
+    network = LayerList(3, 2, FFBPNeurode)
+    for width in hidden:
+        network.add_layer(width)
+        network.move_forward()
+    return network
+
+
+def weights(network):
+    layers = network._layers
+    return [layer[0]._up_W.copy() for layer in layers[1:]]
+
+
+def run_events(network, x):
+    for node, value in zip(network.input_nodes, x):
+        node.set_input(value)
+    return np.array([node.value for node in network.output_nodes])
+
+
+def test_forward_matches_event_path():
+    network = make_network(0)
+    x = [0.2, -0.7, 1.5]
+    expected = run_events(network, x)
+    result = network.forward(x)
+    assert np.allclose(result, expected, atol=1e-6), \
+        "forward() should match the outputs of the neurode event path"
+
+
+def test_shared_weights_ignore_unknown_nodes():
+    network = make_network(5)
+    network.forward([0.1, 0.2, 0.3])
+    hidden = network._layers[1][0]
+    upstream = network.input_nodes[1]
+    stranger = network.output_nodes[1]
+    weight = hidden.get_weight(upstream)
+    assert type(weight) is float
+    assert weight == hidden._up_W[hidden._row, upstream._row]
+    assert hidden.get_weight(stranger) == 0, \
+        "A node that is not upstream should have no weight"
+    before = hidden._up_W.copy()
+    with pytest.raises(KeyError):
+        hidden.adjust_weights(stranger, 1.0)
+    assert np.array_equal(hidden._up_W, before), \
+        "Adjusting an unknown node should not touch the weight matrix"
+
+def test_backward_matches_set_expected():
+    events = make_network(1)
+    vectorized = make_network(1)
+    for before, after in zip(weights(events), weights(vectorized)):
+        assert np.array_equal(before, after)
+    x = [0.9, 0.1, -0.4]
+    target = [0.3, 0.8]
+    run_events(events, x)
+    for node, value in zip(events.output_nodes, target):
+        node.set_expected(value)
+    vectorized.forward(x)
+    vectorized.backward(target)
+    for k, (event_W, vector_W) in enumerate(zip(weights(events),
+                                                weights(vectorized))):
+        assert np.allclose(event_W, vector_W, atol=1e-6), \
+            f"Weight matrix {k} differs between backward() and set_expected()"
+
+
+def test_batch_is_mean_of_single_samples():
+    network = make_network(2)
+    X = np.array([[0.1, 0.2, 0.3], [0.9, -0.5, 0.0]], dtype=np.float32)
+    Y = np.array([[1.0, 0.0], [0.0, 1.0]], dtype=np.float32)
+    start = weights(network)
+    outputs = network.forward_batch(X).copy()
+    for row, x in zip(outputs, X):
+        assert np.allclose(row, network.forward(x), atol=1e-6), \
+            "Each batch row should match forward() of that sample"
+    network.forward_batch(X)
+    network.backward_batch(Y)
+    batched = weights(network)
+    steps = []
+    for x, y in zip(X, Y):
+        single = make_network(2)
+        single.forward(x)
+        single.backward(y)
+        steps.append([after - before for after, before
+                      in zip(weights(single), start)])
+    for k, W in enumerate(batched):
+        mean_step = (steps[0][k] + steps[1][k]) / 2
+        assert np.allclose(W - start[k], mean_step, atol=1e-6), \
+            f"The batch update of matrix {k} should average the samples"
+
+
+@pytest.mark.parametrize("batch_size", [1, 4])
+def test_compiled_step_matches_forward_backward(batch_size):
+    compiled = make_network(3)
+    plain = make_network(3)
+    compiled.compile()
+    rng = np.random.default_rng(3)
+    for _ in range(3):
+        X = rng.random((batch_size, 3), dtype=np.float32)
+        Y = rng.random((batch_size, 2), dtype=np.float32)
+        predictions = compiled.step(X, Y).copy()
+        expected = plain.forward_batch(X).copy()
+        plain.backward_batch(Y)
+        assert np.allclose(predictions, expected, atol=1e-6), \
+            "step() should return the forward_batch() predictions"
+    for W_step, W_plain in zip(weights(compiled), weights(plain)):
+        assert np.allclose(W_step, W_plain, atol=1e-6), \
+            "The compiled step should train exactly like forward_batch() " \
+            "followed by backward_batch()"
+
+
+def test_forward_int8_stays_close_to_forward():
+    network = make_network(4, hidden=(16, 8))
+    rng = np.random.default_rng(4)
+    network.quantize_inference()
+    for x in rng.uniform(-1, 1, (20, 3)).astype(np.float32):
+        expected = network.forward(x).copy()
+        assert np.abs(network.forward_int8(x) - expected).max() < 0.02, \
+            "forward_int8() should approximate forward() closely"
+    assert all(Wq.dtype == np.int8 for Wq in network._Wq)
+
+
+def test_layer_matrices_replace_per_edge_weights(monkeypatch):
+    import Neurode
+
+    def fail():
+        raise AssertionError("Neurodes should not draw their own weights")
+    monkeypatch.setattr(Neurode.random, "random", fail)
+    network = make_network(6)
+    hidden = network._layers[1]
+    assert all(node._weights == {} for node in hidden), \
+        "The weight dictionaries should stay empty until sync_neurodes()"
+    network.sync_neurodes()
+    for node in hidden:
+        assert node._weights == {
+            up: node.get_weight(up) for up in network.input_nodes}
+
+
+def test_cpu_users_do_not_import_cupy():
+    code = ("import sys, LayerList, FFBPNeurode; "
+            "LayerList.LayerList(2, 2, FFBPNeurode.FFBPNeurode); "
+            "print('cupy' in sys.modules)")
+    result = subprocess.run([sys.executable, "-c", code], check=True,
+                            capture_output=True, text=True,
+                            cwd=os.path.dirname(os.path.abspath(__file__)))
+    assert result.stdout.strip() == "False", \
+        "CuPy should only be imported for device='cuda'"
@@ -0,0 +1,44 @@
+import numpy as np
+
+from NNData import NNData, Order, Set
+
+
+def make_data(samples=10, train_factor=0.7):
+    features = [[i, -i] for i in range(samples)]
+    labels = [[i * 10] for i in range(samples)]
+    return NNData(features, labels, train_factor)
+
+
+def test_static_visits_train_indices_in_order():
+    data = make_data()
+    rows = [features[:, 0] for features, _ in
+            data.batches(3, Set.TRAIN, Order.STATIC)]
+    assert np.array_equal(np.concatenate(rows), data._train_indices), \
+        "STATIC should yield every train index exactly once, in order"
+
+
+def test_labels_stay_with_features():
+    data = make_data()
+    for features, labels in data.batches(4, Set.TEST):
+        assert features.dtype == np.float32 and labels.dtype == np.float32
+        assert np.array_equal(labels[:, 0], features[:, 0] * 10), \
+            "Each label row should belong to its feature row"
+
+
+def test_shuffle_yields_permutation():
+    data = make_data(samples=50, train_factor=1)
+    rows = np.concatenate([features[:, 0] for features, _ in
+                           data.batches(8, Set.TRAIN, Order.SHUFFLE)])
+    assert sorted(rows) == list(range(50)), \
+        "SHUFFLE should yield every train sample exactly once"
+
+
+def test_last_batch_is_partial():
+    data = make_data(samples=10, train_factor=1)
+    sizes = [len(features) for features, _ in data.batches(4)]
+    assert sizes == [4, 4, 2], \
+        "Batches should be full except for the remainder at the end"
+
+
+def test_no_data_yields_nothing():
+    assert list(NNData().batches(4)) == []
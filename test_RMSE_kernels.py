@@ -0,0 +1,35 @@
+import numpy as np
+import pytest
+
+RMSE_kernels = pytest.importorskip("RMSE_kernels")
+
+
+@pytest.mark.parametrize("size", [0, 1, 3, 4, 5, 8, 11])
+def test_kernels_cover_tail(size):
+    # The kernels run four elements at a time; every remainder must count.
+    x = np.arange(size, dtype=np.float64)
+    y = -0.5 * x
+    assert RMSE_kernels.squared_euclidean(x, y) == \
+        pytest.approx((1.5 * x) @ (1.5 * x))
+    assert RMSE_kernels.taxicab(x, y) == pytest.approx(1.5 * x.sum())
+
+
+def test_kernels_truncate_like_zip():
+    x = np.array([1.0, 2.0, 3.0, 4.0, 5.0])
+    y = np.array([1.0, 0.0])
+    assert RMSE_kernels.squared_euclidean(x, y) == 4.0, \
+        "Only the overlapping elements should be compared"
+    assert RMSE_kernels.taxicab(y, x) == 2.0
+
+
+def test_unrolled_uses_term_and_square():
+    x = np.array([1.0, -2.0, 4.0])
+    y = np.array([0.0, 1.0, 1.0])
+    taxicab_sq = RMSE_kernels.unrolled("abs(a[{k}] - b[{k}])", 3, True)
+    euclidean_sq = RMSE_kernels.unrolled("(a[{k}] - b[{k}]) ** 2", 3)
+    assert taxicab_sq(x, y) == 49.0
+    assert euclidean_sq(x, y) == 19.0
+    assert RMSE_kernels.unrolled("(a[{k}] - b[{k}]) ** 2", 3) is \
+        euclidean_sq, "Kernels should be memoized, not compiled again"
+    with pytest.raises(ValueError):
+        euclidean_sq(x, y[:2])
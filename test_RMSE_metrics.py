@@ -0,0 +1,157 @@
+import numpy as np
+import pytest
+
+from RMSE import RMSE, Euclidean, Taxicab
+
+
+def test_reset_allows_new_point_size():
+    rmse = Euclidean()
+    rmse += ((1, 2), (1, 3))
+    rmse.reset()
+    rmse += ((1, 2, 3), (1, 2, 4))
+    assert rmse.error == pytest.approx(1.0), \
+        "reset() should forget the point size of the previous data"
+    taxicab = Taxicab()
+    taxicab += ((0, 0, 0), (1, 1, 1))
+    taxicab.reset()
+    assert taxicab.error == 0, "reset() should clear the running sum"
+    taxicab += ((0,), (2,))
+    assert taxicab.error == pytest.approx(2.0)
+
+
+@pytest.mark.parametrize("metric", [Euclidean, Taxicab])
+@pytest.mark.parametrize("size", [2, 20])
+def test_mismatched_lengths_compare_like_zip(metric, size):
+    # size 2 uses the generated Python distance, size 20 the Numba kernel
+    # when it is installed; both must truncate like distance() does.
+    first = tuple(range(size))
+    rmse = metric()
+    rmse += (first, tuple(v + 1 for v in first))
+    rmse += ((1, 2), (1, 2, 3))
+    rmse += ((1, 2, 3), (0, 2))
+    expected = metric.distance((1, 2, 3), (0, 2)) ** 2
+    expected += metric.distance(first, tuple(v + 1 for v in first)) ** 2
+    assert rmse.error == pytest.approx((expected / 3) ** 0.5), \
+        "Points of another size should be compared like zip() does"
+
+
+@pytest.mark.parametrize("metric", [Euclidean, Taxicab])
+def test_large_points_are_not_unrolled(metric):
+    # Unrolled kernels compile one statement per value; large points must
+    # go straight to the generic distance.
+    assert metric.specialized(1000) is metric._distance_sq
+    rmse = metric()
+    rmse += (np.zeros(1000).tolist(), np.ones(1000).tolist())
+    assert rmse._distance_fn is metric._distance_sq
+    assert rmse.error == pytest.approx(metric.distance([0] * 1000,
+                                                       [1] * 1000))
+
+def test_distance_u8():
+    assert Taxicab.distance_u8(bytes([0, 255, 10]), bytes([255, 0, 12])) \
+        == 512, "Differences in both directions should count fully"
+    assert Taxicab.distance_u8(b"", b"") == 0
+    values = bytes(range(256)) * 5 + bytes([7])
+    reversed_values = values[::-1]
+    assert Taxicab.distance_u8(values, reversed_values) == \
+        Taxicab.distance(list(values), list(reversed_values)), \
+        "distance_u8 should match distance() on the byte values"
+    with pytest.raises(ValueError):
+        Taxicab.distance_u8(b"ab", b"abc")
+
+
+@pytest.mark.parametrize("metric", [Euclidean, Taxicab])
+def test_array_batches_match_pairs(metric):
+    predicted = np.arange(30, dtype=np.float64).reshape(10, 3) / 7
+    expected = np.cos(predicted)
+    batched = metric()
+    batched += (predicted[:6], expected[:6])
+    batched += (predicted[6:].astype(np.float32), expected[6:])
+    pairs = metric()
+    for p, e in zip(predicted, expected):
+        pairs += (tuple(p), tuple(e))
+    assert batched.error == pytest.approx(pairs.error), \
+        "+= of 2-D arrays should match adding the rows one by one"
+    assert metric.error_of(predicted, expected) == \
+        pytest.approx(pairs.error), "error_of should match += of the rows"
+    assert metric.error_of(np.empty((0, 3)), np.empty((0, 3))) == 0
+
+
+def test_add_returns_copy():
+    first = Euclidean()
+    first += ((0, 0), (3, 4))
+    second = first + ((0, 0), (0, 0))
+    assert first.error == pytest.approx(5.0), "a + pair should not change a"
+    assert second.error == pytest.approx(12.5 ** 0.5), \
+        "a + pair should include the new pair"
+    second += ((0, 0), (0, 0))
+    assert first.error == pytest.approx(5.0), \
+        "The copy should not share its running sum with the original"
+
+
+def test_add_rejects_non_pairs():
+    rmse = Taxicab()
+    for bad in (5, (1, 2, 3), ((1,),)):
+        with pytest.raises(ValueError):
+            rmse += bad
+
+
+def test_running_sum_is_compensated():
+    # One huge squared error followed by many tiny ones: a naive running
+    # sum drops every tiny term, the compensated sum keeps them.
+    rmse = Euclidean()
+    rmse += ((0.0,), (1e8,))
+    for _ in range(10000):
+        rmse += ((0.0,), (1.0,))
+    exact = (1e16 + 10000) / 10001
+    assert rmse.error == pytest.approx(exact ** 0.5, rel=1e-15), \
+        "Small terms should not be lost next to a large running sum"
+
+
+def test_distance_sq_batch():
+    predicted = np.linspace(-1, 1, 12).reshape(4, 3)
+    expected = np.sin(np.arange(15, dtype=np.float64)).reshape(5, 3)
+    brute = ((predicted[:, None, :] - expected[None, :, :]) ** 2).sum(axis=2)
+    assert np.allclose(Euclidean.distance_sq_batch(predicted, expected),
+                       brute), "distance_sq_batch should match brute force"
+    norms = Euclidean.squared_norms(predicted)
+    assert np.allclose(Euclidean.distance_sq_batch(predicted, expected,
+                                                   predicted_norms=norms),
+                       brute), "Passing precomputed norms should not matter"
+    assert (Euclidean.distance_sq_batch(expected, expected) >= 0).all(), \
+        "Rounding should not produce negative squared distances"
+
+
+def test_subclass_with_only_distance():
+    class MaxNorm(RMSE):
+        @staticmethod
+        def distance(predicted, expected):
+            return max(abs(p - e) for p, e in zip(predicted, expected))
+
+    rmse = MaxNorm()
+    rmse += ((1, 2), (0, 5))
+    rmse += (np.array([[1.0, 2.0], [0.0, 0.0]]),
+             np.array([[0.0, 5.0], [1.0, 1.0]]))
+    assert rmse.error == pytest.approx((19 / 3) ** 0.5), \
+        "A metric that only defines distance() should work with +="
+    assert MaxNorm.error_of([[1, 2], [0, 0]], [[0, 5], [1, 1]]) == \
+        pytest.approx(5 ** 0.5)
+
+
+def test_kernels_only_for_arrays_and_long_points(monkeypatch):
+    import RMSE as module
+    calls = []
+
+    class Kernels:
+        def squared_euclidean(a, b):
+            calls.append(len(a))
+            return 0.0
+        taxicab = squared_euclidean
+
+    monkeypatch.setattr(module, "RMSE_kernels", Kernels)
+    assert Euclidean.distance([0, 0], [3, 4]) == 5
+    assert Taxicab.distance((0, 0), (3, 4)) == 7
+    assert calls == [], "Short points should not pay for a kernel call"
+    long = [1.0] * module.KERNEL_MIN_LENGTH
+    Euclidean.distance(long, long)
+    Taxicab.distance(np.zeros(2), np.zeros(2))
+    assert calls == [module.KERNEL_MIN_LENGTH, 2]